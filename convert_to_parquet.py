@@ -0,0 +1,6 @@
+import pandas as pd
+
+# One-time conversion of the CSV sources to Parquet for faster, typed loads
+for name in ["merged_player_ratings", "draft_strategy"]:
+    df = pd.read_csv(f"data/{name}.csv")
+    df.to_parquet(f"data/{name}.parquet", compression="zstd")
@@ -0,0 +1,45 @@
+from st_aggrid import JsCode
+
+# AgGrid JavaScript callbacks and cell styles, built once at import
+
+DRAFTED_RENDERER = JsCode("""
+    function(params) {
+        return params.value === 'False' ? '' : params.value;
+    }
+""")
+
+# Rating colors are applied with CSS classes so the grid evaluates the
+# short rule expressions instead of calling a JS function per cell
+RATING_CELL_CLASS_RULES = {
+    "rating-5": "x == 5",
+    "rating-4": "x == 4",
+    "rating-2": "x == 2",
+    "rating-1": "x == 1",
+    "rating-other": "x != 5 && x != 4 && x != 2 && x != 1",
+}
+
+# Passed to AgGrid(custom_css=...), which injects it into the grid's iframe
+RATING_CSS = {
+    ".rating-5": {"color": "white", "background-color": "darkgreen"},
+    ".rating-4": {"color": "black", "background-color": "lightgreen"},
+    ".rating-2": {"color": "black", "background-color": "lightcoral"},
+    ".rating-1": {"color": "white", "background-color": "darkred"},
+    ".rating-other": {"color": "black", "background-color": "white"},
+}
+
+ON_CELL_VALUE_CHANGED = JsCode("""
+function(params) {
+    if (params.colDef.field === 'drafted') {
+        params.api.refreshCells({force: true});
+        params.api.redrawRows();
+    }
+}
+""")
+
+GET_ROW_STYLE = JsCode("""
+function(params) {
+    if (params.data.drafted === 'My Team') return {'backgroundColor': '#90EE90'};
+    if (params.data.drafted === 'Other Team') return {'backgroundColor': '#FFA07A'};
+    return null;
+}
+""")
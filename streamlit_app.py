@@ -1,57 +1,31 @@
 import pandas as pd
 import streamlit as st
-from st_aggrid import AgGrid, GridOptionsBuilder, JsCode
+from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
+
+from grid_styles import (DRAFTED_RENDERER, GET_ROW_STYLE, ON_CELL_VALUE_CHANGED,
+                         RATING_CELL_CLASS_RULES, RATING_CSS)
 
 # Set page title
 st.set_page_config(page_title="Fantasy Football Draft Strategy", layout="wide")
 
 
-@st.cache_data
+# Shared across sessions without copying; callers must not mutate it in place
+@st.cache_resource
 def load_data():
-    df = pd.read_csv("data/draft_strategy.csv")
-    df['drafted'] = 'False'
-    return df
-
-
-if 'df' not in st.session_state:
-    st.session_state.df = load_data()
-
-
-def filter_dataframe(df, position, round, search_term):
-    filtered = df.copy()
-    if position != "All":
-        filtered = filtered[filtered["Position"] == position]
-    if round != "All":
-        filtered = filtered[filtered["Round"] == round]
-    if search_term:
-        filtered = filtered[filtered["Player"].str.contains(
-            search_term, case=False)]
-    return filtered
-
-
-st.title("Fantasy Football Draft Strategy Dashboard")
-
-
-# Display My Team
-st.header("My Team")
-my_team = st.session_state.df[st.session_state.df['drafted'] == 'My Team'].sort_values('Rank')
-st.dataframe(my_team[['Rank', 'Player', 'Position', 'Team', 'Value', 'VBD', 'Tier', 'Rating', 'Rookie', 'Round']])
-
+    df = pd.read_parquet("data/draft_strategy.parquet", engine="pyarrow")
+    df['drafted'] = pd.Categorical(['False'] * len(df),
+                                   categories=['False', 'My Team', 'Other Team'])
+    df['Position'] = df['Position'].astype('category')
+    df.set_index('Player', inplace=True)
+    df['_player_lc'] = df.index.str.lower()
+    positions = ["All"] + sorted(df["Position"].cat.categories.tolist())
+    rounds = ["All"] + sorted(df["Round"].unique().tolist())
+    return df, positions, rounds
 
-# Sidebar for filtering
-st.sidebar.header("Filters")
 
-positions = ["All"] + sorted(st.session_state.df["Position"].unique().tolist())
-selected_position = st.sidebar.selectbox(
-    "Select Position", positions, key="position_filter")
+players, positions, rounds = load_data()
 
-rounds = ["All"] + sorted(st.session_state.df["Round"].unique().tolist())
-selected_round = st.sidebar.selectbox(
-    "Select Round", rounds, key="round_filter")
-
-# Add this at the beginning of your sidebar content
-st.sidebar.header("User Guide")
-st.sidebar.markdown("""
+_GUIDE_MD = """
 ### Fantasy Football Draft Strategy Dashboard
 
 This tool helps you make informed decisions during your fantasy football draft.
@@ -75,146 +49,194 @@ This tool helps you make informed decisions during your fantasy football draft.
 - Balance your team across positions.
 
 Good luck with your draft!
-""")
-
-# Main content
-st.header("Draft Strategy")
-
-search_term = st.text_input("Search Players", "", key="search_filter")
-
-# Apply filters
-filtered_df = filter_dataframe(
-    st.session_state.df, selected_position, selected_round, search_term)
-
-# Configure AgGrid
-gb = GridOptionsBuilder.from_dataframe(filtered_df)
-gb.configure_selection('single', use_checkbox=False, pre_selected_rows=[])
-gb.configure_default_column(flex=1, min_width=100,
-                            resizable=True, sortable=True)
-
-column_config = {
-    "Rank": "Rank",
-    "Player": "Player Name",
-    "Position": "Position",
-    "Value": "Value",
-    "Tier": "Tier",
-    "Rating": "Rating",
-    "Rookie": "Rookie",
-    "Round": "Round",
-    "drafted": "Drafted",
-    "Team": "Team",
-    "VBD": "VBD"
-}
-
-for col, header in column_config.items():
-    gb.configure_column(col, header_name=header)
-
-# Hide the 'Analyst Rating' column
-gb.configure_column("Analyst Rating", hide=True)
-
-gb.configure_column("drafted",
-                    editable=True,
-                    cellEditor='agSelectCellEditor',
-                    cellEditorParams={
-                        'values': ['False', 'My Team', 'Other Team']
-                    },
-                    cellRenderer=JsCode("""
-                        function(params) {
-                            return params.value === 'False' ? '' : params.value;
-                        }
-                    """))
-
-cellstyle_jscode = JsCode("""
-function(params) {
-    const value = params.value;
-    if (value === 5) return {'color': 'white', 'backgroundColor': 'darkgreen'};
-    if (value === 4) return {'color': 'black', 'backgroundColor': 'lightgreen'};
-    if (value === 2) return {'color': 'black', 'backgroundColor': 'lightcoral'};
-    if (value === 1) return {'color': 'white', 'backgroundColor': 'darkred'};
-    return {'color': 'black', 'backgroundColor': 'white'};
-}
-""")
-
-gb.configure_column("Rating", cellStyle=cellstyle_jscode)
-
-gb.configure_grid_options(
-    onCellValueChanged=JsCode("""
-    function(params) {
-        if (params.colDef.field === 'drafted') {
-            params.api.refreshCells({force: true});
-            params.api.redrawRows();
-        }
-    }
-    """),
-    getRowStyle=JsCode("""
-    function(params) {
-        if (params.data.drafted === 'My Team') return {'backgroundColor': '#90EE90'};
-        if (params.data.drafted === 'Other Team') return {'backgroundColor': '#FFA07A'};
-        return null;
+"""
+
+# Only these columns are sent to the grid; 'Analyst Rating' is looked up
+# server-side for the selected player
+DISPLAY_COLUMNS = ['Rank', 'Player', 'Position', 'Team', 'Value', 'VBD',
+                   'Tier', 'Rating', 'Rookie', 'Round', 'drafted']
+
+if 'df' not in st.session_state:
+    st.session_state.df = players
+
+
+@st.cache_resource
+def _by_position_round():
+    df = load_data()[0].reset_index()
+    # Row number in the original table, to restore order after slicing
+    df['_row'] = range(len(df))
+    return df.set_index(['Position', 'Round']).sort_index()
+
+
+def _search(df, search_term):
+    # Single characters match nearly every player; skip the scan
+    if len(search_term) >= 2:
+        df = df[df['_player_lc'].str.contains(
+            search_term.lower(), regex=False, na=False)]
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def _filter(position, round, search_term):
+    # Position, Round and Player never change after load, so the matching
+    # rows can be cached globally; 'drafted' is picked up by the caller.
+    if position == "All" and round == "All":
+        return _search(load_data()[0], search_term).index
+
+    if position != "All" and round != "All":
+        key, level = (position, round), ['Position', 'Round']
+    elif position != "All":
+        key, level = position, 'Position'
+    else:
+        key, level = round, 'Round'
+    by_pr = _by_position_round()
+    try:
+        df = by_pr.xs(key, level=level, drop_level=False)
+    except KeyError:
+        # No players for this Position/Round combination
+        df = by_pr.iloc[:0]
+    df = _search(df, search_term)
+    # The MultiIndex groups rows by Position/Round; restore the original order
+    return pd.Index(df.sort_values('_row')['Player'])
+
+
+def filter_dataframe(df, position, round, search_term):
+    return df.loc[_filter(position, round, search_term)]
+
+
+@st.cache_resource
+def build_grid_options(columns):
+    # The grid schema is static, so options only depend on the column set.
+    # cache_resource because the builder's output holds unpicklable defaultdicts.
+    gb = GridOptionsBuilder.from_dataframe(load_data()[0].reset_index()[list(columns)])
+    gb.configure_selection('single', use_checkbox=False, pre_selected_rows=[])
+    gb.configure_default_column(flex=1, min_width=100,
+                                resizable=True, sortable=True)
+
+    column_config = {
+        "Rank": "Rank",
+        "Player": "Player Name",
+        "Position": "Position",
+        "Value": "Value",
+        "Tier": "Tier",
+        "Rating": "Rating",
+        "Rookie": "Rookie",
+        "Round": "Round",
+        "drafted": "Drafted",
+        "Team": "Team",
+        "VBD": "VBD"
     }
-    """)
-)
-
-grid_options = gb.build()
-
-grid_response = AgGrid(
-    filtered_df,
-    gridOptions=grid_options,
-    height=380,
-    width='100%',
-    data_return_mode='AS_INPUT',
-    update_mode='MODEL_CHANGED',
-    fit_columns_on_grid_load=True,
-    allow_unsafe_jscode=True,
-    theme='streamlit',
-    key='player_grid',
-    reload_data=False
-)
-
-# Player Analysis Section
-st.header("Player Analysis")
-selected_rows = grid_response['selected_rows']
-
-if not selected_rows.empty:
-    selected_player = selected_rows.iloc[0]
-
-    player_name = selected_player.get('Player')
-    analyst_rating = selected_player.get('Analyst Rating')
-
-    if player_name is not None:
-        st.subheader(f"{player_name}")
-        if analyst_rating is not None:
-            st.markdown(analyst_rating)
+
+    for col, header in column_config.items():
+        gb.configure_column(col, header_name=header)
+
+    gb.configure_column("drafted",
+                        editable=True,
+                        cellEditor='agSelectCellEditor',
+                        cellEditorParams={
+                            'values': ['False', 'My Team', 'Other Team']
+                        },
+                        cellRenderer=DRAFTED_RENDERER)
+
+    gb.configure_column("Rating", cellClassRules=RATING_CELL_CLASS_RULES)
+
+    gb.configure_grid_options(
+        onCellValueChanged=ON_CELL_VALUE_CHANGED,
+        getRowStyle=GET_ROW_STYLE
+    )
+
+    return gb.build()
+
+
+st.title("Fantasy Football Draft Strategy Dashboard")
+
+
+# Display My Team
+st.header("My Team")
+my_team = st.session_state.df[st.session_state.df['drafted'] == 'My Team'].sort_values('Rank')
+st.dataframe(my_team.reset_index()[['Rank', 'Player', 'Position', 'Team', 'Value', 'VBD', 'Tier', 'Rating', 'Rookie', 'Round']])
+
+
+# Sidebar for filtering
+st.sidebar.header("Filters")
+
+selected_position = st.sidebar.selectbox(
+    "Select Position", positions, key="position_filter")
+
+selected_round = st.sidebar.selectbox(
+    "Select Round", rounds, key="round_filter")
+
+with st.sidebar.expander("User Guide", expanded=False):
+    st.markdown(_GUIDE_MD)
+
+
+# Main content. Typing in the search box, selecting a player or editing
+# the grid reruns only this fragment; a drafted-status change triggers a
+# full rerun so My Team is refreshed.
+@st.fragment
+def draft_board(selected_position, selected_round):
+    st.header("Draft Strategy")
+
+    search_term = st.text_input("Search Players", "", key="search_filter")
+
+    # Apply filters
+    filtered_df = filter_dataframe(
+        st.session_state.df, selected_position, selected_round, search_term)
+
+    grid_options = build_grid_options(tuple(DISPLAY_COLUMNS))
+
+    grid_response = AgGrid(
+        filtered_df.reset_index()[DISPLAY_COLUMNS],
+        gridOptions=grid_options,
+        height=380,
+        width='100%',
+        data_return_mode='AS_INPUT',
+        update_mode=GridUpdateMode.VALUE_CHANGED | GridUpdateMode.SELECTION_CHANGED,
+        fit_columns_on_grid_load=True,
+        allow_unsafe_jscode=True,
+        theme='streamlit',
+        custom_css=RATING_CSS,
+        key='player_grid',
+        reload_data=False
+    )
+
+    # Player Analysis Section
+    st.header("Player Analysis")
+    selected_rows = grid_response['selected_rows']
+
+    # selected_rows is None before any selection and may be a list or a DataFrame
+    if selected_rows is not None and len(selected_rows):
+        selected_player = selected_rows.iloc[0] if hasattr(
+            selected_rows, 'iloc') else selected_rows[0]
+
+        player_name = selected_player.get('Player')
+        analyst_rating = st.session_state.df['Analyst Rating'].get(player_name)
+
+        if player_name is not None:
+            st.subheader(f"{player_name}")
+            if pd.notna(analyst_rating):
+                st.markdown(analyst_rating)
+            else:
+                st.error(f"No analysis found for player: {player_name}")
         else:
-            st.error(f"No analysis found for player: {player_name}")
+            st.error("Player name not found in selected data")
     else:
-        st.error("Player name not found in selected data")
-else:
-    st.info("Select a player from the table to view their analysis.")
-
-# Update the dataframe based on user interactions
-if grid_response['data'] is not None:
-    dataframe_changed = False
-    drafted_players_updated = []
-
-    for index, row in grid_response['data'].iterrows():
-        original_draft_status = st.session_state.df.loc[st.session_state.df['Player']
-                                                        == row['Player'], 'drafted'].iloc[0]
-        if original_draft_status != row['drafted']:
-            st.session_state.df.loc[st.session_state.df['Player']
-                                    == row['Player'], 'drafted'] = row['drafted']
-            dataframe_changed = True
-            drafted_players_updated.append(row['Player'])
-
-    if dataframe_changed:
-        st.rerun()
-
-
-# Force a rerun if any filter changes
-if st.session_state.get('prev_position') != selected_position or \
-   st.session_state.get('prev_round') != selected_round or \
-   st.session_state.get('prev_search') != search_term:
-    st.session_state.prev_position = selected_position
-    st.session_state.prev_round = selected_round
-    st.session_state.prev_search = search_term
-    st.rerun()
+        st.info("Select a player from the table to view their analysis.")
+
+    # Update the dataframe based on user interactions. st-aggrid returns the
+    # data as a JSON string rather than a DataFrame when the grid is empty.
+    if isinstance(grid_response['data'], pd.DataFrame):
+        new = grid_response['data'].set_index('Player')['drafted']
+        old = st.session_state.df['drafted']
+        changed = new[new != old.reindex(new.index)]
+
+        if not changed.empty:
+            # Copy only the 'drafted' column so the shared frame stays untouched
+            df = st.session_state.df.copy(deep=False)
+            df['drafted'] = df['drafted'].copy()
+            df.loc[changed.index, 'drafted'] = changed.values
+            st.session_state.df = df
+            st.rerun()
+
+
+draft_board(selected_position, selected_round)